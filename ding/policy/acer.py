@@ -1,8 +1,11 @@
 from collections import namedtuple
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Tuple, Callable, Optional
 import copy
+import inspect
+import logging
 
 import torch
+import torch.nn.functional as F
 
 from ding.model import model_wrap
 from ding.rl_utils import get_train_sample, compute_q_retraces, acer_policy_error,\
@@ -12,7 +15,91 @@ from ding.utils import POLICY_REGISTRY
 from ding.utils.data import default_collate, default_decollate
 from ding.policy.base_policy import Policy
 
-EPS = 1e-8
+# ``torch.inference_mode`` is only available since torch 1.9
+_inference_mode = torch.inference_mode if hasattr(torch, 'inference_mode') else torch.no_grad
+
+
+def _compile_forward(fn: Callable) -> Callable:
+    r"""
+    Overview:
+        Compile ``fn`` with ``torch.compile``, and permanently fall back to the eager ``fn`` if the backend \
+        compiler fails, so that a compile error never breaks training.
+    Arguments:
+        - fn (:obj:`Callable`): the forward function to be compiled.
+    Returns:
+        - compiled_fn (:obj:`Callable`): the compiled forward function with eager fallback.
+    """
+    compiled_fn = torch.compile(fn, mode='reduce-overhead', dynamic=False)
+    use_compiled = True
+
+    def wrapper(*args, **kwargs):
+        nonlocal use_compiled
+        if use_compiled:
+            try:
+                return compiled_fn(*args, **kwargs)
+            except torch._dynamo.exc.BackendCompilerFailed:
+                use_compiled = False
+        return fn(*args, **kwargs)
+
+    return wrapper
+
+
+class _ObsBatchBuffer(object):
+    r"""
+    Overview:
+        Stack per-env tensor observations into a batch tensor, which is reused across calls as long as the \
+        batch shape, dtype and device stay the same, rather than allocating a new one on each call like \
+        ``default_collate``.
+    Interfaces:
+        collate
+    """
+
+    def __init__(self, pin_memory: bool = False) -> None:
+        r"""
+        Overview:
+            Initialize the empty buffer.
+        Arguments:
+            - pin_memory (:obj:`bool`): Whether to allocate cpu buffers in pinned memory, so that they can be \
+                copied to cuda asynchronously without an extra staging copy.
+        """
+        self._pin_memory = pin_memory
+        self._buffer = None
+
+    def collate(self, obs: List[Any]) -> Any:
+        r"""
+        Overview:
+            Stack the observation list into the reused batch buffer. Non tensor observations are passed to \
+            ``default_collate``.
+        Arguments:
+            - obs (:obj:`List[Any]`): the observation of each env.
+        Returns:
+            - batch (:obj:`Any`): the collated observation batch.
+        """
+        if not all(isinstance(o, torch.Tensor) for o in obs):
+            return default_collate(obs)
+        shape = (len(obs), ) + tuple(obs[0].shape)
+        if self._buffer is None or self._buffer.shape != shape or self._buffer.dtype != obs[0].dtype \
+                or self._buffer.device != obs[0].device:
+            pin_memory = self._pin_memory and obs[0].device.type == 'cpu'
+            self._buffer = torch.empty(shape, dtype=obs[0].dtype, device=obs[0].device, pin_memory=pin_memory)
+        return torch.stack(obs, dim=0, out=self._buffer)
+
+
+class _TracedActor(object):
+    r"""
+    Overview:
+        Adapt a model traced on its ``compute_actor`` method to the ``forward(inputs, mode)`` interface, \
+        which is called by model wrappers.
+    Interfaces:
+        forward
+    """
+
+    def __init__(self, traced_model: torch.jit.ScriptModule) -> None:
+        self._traced_model = traced_model
+
+    def forward(self, inputs: torch.Tensor, mode: str) -> Dict[str, torch.Tensor]:
+        assert mode == 'compute_actor', "traced actor only supports compute_actor mode, but get {}".format(mode)
+        return self._traced_model.compute_actor(inputs)
 
 
 @POLICY_REGISTRY.register('acer')
@@ -41,6 +128,18 @@ class ACERPolicy(Policy):
                                                            |  collection. Only                   |
                                                            | valid in serial training            | means more off-policy
         8   ``c_clip_ratio``       float    1.0            | clip ratio of importance weights    |
+        9   ``learn.use_torch_``   bool     False          | Whether to compile the learn model  | only valid for
+            ``compile``                                    | forward with ``torch.compile``      | torch>=2.0
+        10  ``collect.use_``       bool     False          | Whether to compile the collect      | only valid for
+            ``torch_compile``                              | model forward with torch.compile    | torch>=2.0
+        11  ``eval.use_torch_``    bool     False          | Whether to compile the eval model   | only valid for
+            ``compile``                                    | forward with ``torch.compile``      | torch>=2.0
+        12  ``collect.use_``       bool     False          | Whether to run the collect actor    | ignored if collect.
+            ``jit_trace``                                  | with TorchScript tracing            | use_torch_compile
+        13  ``eval.use_jit_``      bool     False          | Whether to run the eval actor with  | ignored if eval.
+            ``trace``                                      | TorchScript tracing                 | use_torch_compile
+        14  ``half_precision_``    bool     False          | Whether to store float obs and      | cast back to float32
+            ``storage``                                    | logit of transitions in float16     | in learn mode
         == ======================= ======== ============== ===================================== =======================
     """
     unroll_len = 32
@@ -53,6 +152,9 @@ class ACERPolicy(Policy):
         priority=False,
         # (bool) Whether use Importance Sampling Weight to correct biased update. If True, priority must be True.
         priority_IS_weight=False,
+        # (bool) Whether to store float obs and logit of transitions in half precision to halve the replay buffer
+        # memory and the host to device traffic. They are cast back to float32 in learn mode.
+        half_precision_storage=False,
         learn=dict(
             # (str) the type of gradient clip method
             grad_clip_type=None,
@@ -81,7 +183,9 @@ class ACERPolicy(Policy):
             trust_region_value=1.0,
             learning_rate_actor=0.0005,
             learning_rate_critic=0.0005,
-            target_theta=0.01
+            target_theta=0.01,
+            # (bool) Whether to compile the learn model forward with ``torch.compile`` (only valid for torch>=2.0)
+            use_torch_compile=False,
         ),
         collect=dict(
             # (int) collect n_sample data, train model n_iteration times
@@ -95,8 +199,18 @@ class ACERPolicy(Policy):
                 type='sample',
                 collect_print_freq=1000,
             ),
+            # (bool) Whether to compile the collect model forward with ``torch.compile`` (only valid for torch>=2.0)
+            use_torch_compile=False,
+            # (bool) Whether to run the collect actor with TorchScript tracing, ignored if use_torch_compile is True
+            use_jit_trace=False,
+        ),
+        eval=dict(
+            evaluator=dict(eval_freq=200, ),
+            # (bool) Whether to compile the eval model forward with ``torch.compile`` (only valid for torch>=2.0)
+            use_torch_compile=False,
+            # (bool) Whether to run the eval actor with TorchScript tracing, ignored if use_torch_compile is True
+            use_jit_trace=False,
         ),
-        eval=dict(evaluator=dict(eval_freq=200, ), ),
         other=dict(replay_buffer=dict(
             replay_buffer_size=1000,
             max_use=16,
@@ -120,14 +234,18 @@ class ACERPolicy(Policy):
             self._model.critic.parameters(),
             lr=self._cfg.learn.learning_rate_critic,
         )
-        self._target_model = copy.deepcopy(self._model)
         self._target_model = model_wrap(
-            self._target_model,
+            self._build_target_model(),
             wrapper_name='target',
             update_type='momentum',
             update_kwargs={'theta': self._cfg.learn.target_theta}
         )
         self._learn_model = model_wrap(self._model, wrapper_name='base')
+        self._target_stream = torch.cuda.Stream() if self._cuda else None
+        if self._cfg.learn.use_torch_compile and hasattr(torch, 'compile'):
+            # The compiled function is a wrapper attribute rather than a compiled submodule, so the shared
+            # ``self._model`` stays eager for other modes and parameter names in state_dict are unchanged.
+            self._learn_model.forward = _compile_forward(self._model.forward)
 
         self._action_shape = self._cfg.model.action_shape
         self._unroll_len = self._cfg.learn.unroll_len
@@ -147,11 +265,40 @@ class ACERPolicy(Policy):
         self._learn_model.reset()
         self._target_model.reset()
 
+    def _build_target_model(self) -> torch.nn.Module:
+        r"""
+        Overview:
+            Rebuild the target model from ``cfg.model`` and copy the weights of the main model, rather than \
+            deep-copying the whole module. Models which can't be rebuilt from ``cfg.model``, e.g. a user-defined \
+            model with a different constructor, fall back to deepcopy.
+        Returns:
+            - target_model (:obj:`torch.nn.Module`): The target model, which has the same weights as the main model.
+        """
+        model_cls = type(self._model)
+        try:
+            inspect.signature(model_cls).bind(**self._cfg.model)
+        except TypeError as e:
+            logging.warning("Can't rebuild ACER target model from cfg.model, use deepcopy instead: {}".format(e))
+            return copy.deepcopy(self._model)
+        # the init weights are overwritten below, so fork the rng to leave the global random state untouched
+        with torch.random.fork_rng(devices=[]):
+            target_model = model_cls(**self._cfg.model)
+        state_dict = self._model.state_dict()
+        target_state_dict = target_model.state_dict()
+        if state_dict.keys() != target_state_dict.keys() or \
+                any(v.shape != target_state_dict[k].shape for k, v in state_dict.items()):
+            logging.warning("ACER target model rebuilt from cfg.model doesn't match the main model, use deepcopy")
+            return copy.deepcopy(self._model)
+        target_model.load_state_dict(state_dict)
+        return target_model.to(self._device)
+
     def _data_preprocess_learn(self, data: List[Dict[str, Any]]):
         """
         Overview:
             Data preprocess function of learn mode.
             Convert list trajectory data to to trajectory data, which is a dict of tensors.
+            The step fields of each sample are already stacked along time by ``self._get_train_sample``, and \
+            'next_obs' is only the next observation of the last step.
         Arguments:
             - data (:obj:`List[Dict[str, Any]]`): List type data, a list of data for training. Each list element is a \
             dict, whose values are torch.Tensor or np.ndarray or dict/list combinations, keys include at least 'obs',\
@@ -173,19 +320,22 @@ class ACERPolicy(Policy):
         """
         data = default_collate(data)
         if self._cuda:
-            data = to_device(data, self._device)
+            data = to_device(data, self._device, non_blocking=True)
         data['weight'] = data.get('weight', None)
+        # the collated step fields are batch first, i.e. B,T,..., and next_obs is the last next_obs of shape B,...
+        # shape (T+1),B,env_obs_shape
+        obs_plus_1 = torch.cat((data['obs'], data['next_obs'].unsqueeze(1)), dim=1).transpose(0, 1)
         # shape (T+1)*B,env_obs_shape
-        data['obs_plus_1'] = torch.cat((data['obs'] + data['next_obs'][-1:]), dim=0)
-        data['logit'] = torch.cat(
-            data['logit'], dim=0
-        ).reshape(self._unroll_len, -1, self._action_shape)  # shape T,B,env_action_shape
-        data['action'] = torch.cat(data['action'], dim=0).reshape(self._unroll_len, -1)  # shape T,B,
-        data['done'] = torch.cat(data['done'], dim=0).reshape(self._unroll_len, -1).float()  # shape T,B,
-        data['reward'] = torch.cat(data['reward'], dim=0).reshape(self._unroll_len, -1)  # shape T,B,
-        data['weight'] = torch.cat(
+        data['obs_plus_1'] = obs_plus_1.reshape(-1, *obs_plus_1.shape[2:]).float()
+        data['logit'] = data['logit'].transpose(0, 1).reshape(
+            self._unroll_len, -1, self._action_shape
+        ).float()  # shape T,B,env_action_shape
+        data['action'] = data['action'].transpose(0, 1).reshape(self._unroll_len, -1)  # shape T,B,
+        data['done'] = data['done'].transpose(0, 1).reshape(self._unroll_len, -1).float()  # shape T,B,
+        data['reward'] = data['reward'].transpose(0, 1).reshape(self._unroll_len, -1)  # shape T,B,
+        data['weight'] = torch.stack(
             data['weight'], dim=0
-        ).reshape(self._unroll_len, -1) if data['weight'] else None  # shape T,B
+        ).view(self._unroll_len, -1) if data['weight'] is not None else None  # shape T,B
         return data
 
     def _forward_learn(self, data: List[Dict[str, Any]]) -> Dict[str, Any]:
@@ -208,77 +358,116 @@ class ACERPolicy(Policy):
         """
         data = self._data_preprocess_learn(data)
         self._learn_model.train()
+        if self._cuda:
+            # the average policy forward doesn't depend on the learn model, so it is issued on a side stream to
+            # overlap with the learn model forward
+            self._target_stream.wait_stream(torch.cuda.current_stream())
+            with torch.cuda.stream(self._target_stream), torch.no_grad():
+                avg_action_data = self._target_model.forward(data['obs_plus_1'], mode='compute_actor')
+            data['obs_plus_1'].record_stream(self._target_stream)
         action_data = self._learn_model.forward(data['obs_plus_1'], mode='compute_actor')
         q_value_data = self._learn_model.forward(data['obs_plus_1'], mode='compute_critic')
-        avg_action_data = self._target_model.forward(data['obs_plus_1'], mode='compute_actor')
+        if self._cuda:
+            torch.cuda.current_stream().wait_stream(self._target_stream)
+            avg_action_data['logit'].record_stream(torch.cuda.current_stream())
+        else:
+            with torch.no_grad():
+                # the average policy is only used as a constant in trust region and kl_div
+                avg_action_data = self._target_model.forward(data['obs_plus_1'], mode='compute_actor')
 
         target_logit, behaviour_logit, avg_logit, actions, q_values, rewards, weights = self._reshape_data(
             action_data, avg_action_data, q_value_data, data
         )
         # shape (T+1),B,env_action_shape
-        target_pi = torch.softmax(target_logit, dim=-1)
+        log_target_pi = F.log_softmax(target_logit, dim=-1)
+        target_pi = log_target_pi.exp()
         # shape T,B,env_action_shape
-        behaviour_pi = torch.softmax(behaviour_logit, dim=-1)
+        log_behaviour_pi = F.log_softmax(behaviour_logit, dim=-1)
         # shape (T+1),B,env_action_shape
-        avg_pi = torch.softmax(avg_logit, dim=-1)
+        log_avg_pi = F.log_softmax(avg_logit, dim=-1)
+        avg_pi = log_avg_pi.exp()
         with torch.no_grad():
             # shape T,B,env_action_shape
-            ratio = target_pi[0:-1, ...] / (behaviour_pi + EPS)
+            ratio = (log_target_pi[0:-1] - log_behaviour_pi).exp()
             # shape (T+1),B,1
-            v_pred = (q_values * target_pi).sum(-1).unsqueeze(-1)
+            v_pred = (q_values * target_pi).sum(-1, keepdim=True)
             # Calculate retrace
             q_retraces = compute_q_retraces(q_values, v_pred, rewards, actions, weights, ratio, self._gamma)
 
         # the terminal states' weights are 0. it needs to be shift to count valid state
-        weights_ext = torch.ones_like(weights)
-        weights_ext[1:] = weights[0:-1]
-        weights = weights_ext
+        weights = F.pad(weights[0:-1], (0, 0, 1, 0), value=1.0)  # shape T,B
         q_retraces = q_retraces[0:-1]  # shape T,B,1
         q_values = q_values[0:-1]  # shape T,B,env_action_shape
         v_pred = v_pred[0:-1]  # shape T,B,1
         target_pi = target_pi[0:-1]  # shape T,B,env_action_shape
+        log_target_pi = log_target_pi[0:-1]  # shape T,B,env_action_shape
         avg_pi = avg_pi[0:-1]  # shape T,B,env_action_shape
+        log_avg_pi = log_avg_pi[0:-1]  # shape T,B,env_action_shape
         total_valid = weights.sum()  # 1
+        # shared by all the loss reductions below
+        w = weights.unsqueeze(-1)  # shape T,B,1
+        inv_valid = total_valid.reciprocal()  # 1
         # ====================
         # policy update
         # ====================
         actor_loss, bc_loss = acer_policy_error(
             q_values, q_retraces, v_pred, target_pi, actions, ratio, self._c_clip_ratio
         )
-        actor_loss = actor_loss * weights.unsqueeze(-1)
-        bc_loss = bc_loss * weights.unsqueeze(-1)
-        dist_new = torch.distributions.categorical.Categorical(probs=target_pi)
-        entropy_loss = (dist_new.entropy() * weights).unsqueeze(-1)  # shape T,B,1
-        total_actor_loss = (actor_loss + bc_loss + self._entropy_weight * entropy_loss).sum() / total_valid
+        # the entropy must be a function of target_pi itself (not log_target_pi), because the trust region below
+        # only projects the gradient w.r.t. target_pi. target_pi comes from softmax, so the simplex check of
+        # argument validation is skipped, which would otherwise force a device-host sync in the actor update
+        dist_new = torch.distributions.categorical.Categorical(probs=target_pi, validate_args=False)
+        entropy_loss = dist_new.entropy().unsqueeze(-1)  # shape T,B,1
+        # weight and reduce all the actor loss terms in one expression, the weighted terms are only used for logging
+        total_actor_loss = ((actor_loss + bc_loss + self._entropy_weight * entropy_loss) * w).sum() * inv_valid
         self._optimizer_actor.zero_grad()
-        actor_gradients = torch.autograd.grad(-total_actor_loss, target_pi, retain_graph=True)
+        # only the graph above target_pi is consumed here, the part below it is kept for target_pi.backward
+        actor_gradients = torch.autograd.grad(-total_actor_loss, target_pi)
         if self._use_trust_region:
             actor_gradients = acer_trust_region_update(actor_gradients, target_pi, avg_pi, self._trust_region_value)
         target_pi.backward(actor_gradients)
+        if self._cfg.learn.multi_gpu:
+            self.sync_gradients(self._learn_model.actor)
         self._optimizer_actor.step()
 
         # ====================
         # critic update
         # ====================
-        critic_loss = (acer_value_error(q_values, q_retraces, actions) * weights.unsqueeze(-1)).sum() / total_valid
+        critic_loss = (acer_value_error(q_values, q_retraces, actions) * w).sum() * inv_valid
         self._optimizer_critic.zero_grad()
         critic_loss.backward()
+        if self._cfg.learn.multi_gpu:
+            self.sync_gradients(self._learn_model.critic)
         self._optimizer_critic.step()
         self._target_model.update(self._learn_model.state_dict())
+        # switch the shared model back, so that collect and eval modes needn't call ``eval()`` on each forward
+        self._learn_model.eval()
 
         with torch.no_grad():
-            kl_div = avg_pi * ((avg_pi + EPS).log() - (target_pi + EPS).log())
-            kl_div = (kl_div.sum(-1) * weights).sum() / total_valid
+            kl_div = (avg_pi * (log_avg_pi - log_target_pi)).sum(-1)
+            kl_div = (kl_div * weights).sum() * inv_valid
+            # gather all the scalars into one tensor, so that only one device-host sync is needed
+            scalars = torch.stack(
+                [
+                    (actor_loss * w).sum() * inv_valid,
+                    (bc_loss * w).sum() * inv_valid,
+                    total_actor_loss,
+                    critic_loss,
+                    (entropy_loss * w).sum() * inv_valid,
+                    kl_div,
+                ]
+            ).tolist()
+        actor_loss, bc_loss, policy_loss, critic_loss, entropy_loss, kl_div = scalars
 
         return {
             'cur_actor_lr': self._optimizer_actor.defaults['lr'],
             'cur_critic_lr': self._optimizer_critic.defaults['lr'],
-            'actor_loss': (actor_loss.sum() / total_valid).item(),
-            'bc_loss': (bc_loss.sum() / total_valid).item(),
-            'policy_loss': total_actor_loss.item(),
-            'critic_loss': critic_loss.item(),
-            'entropy_loss': (entropy_loss.sum() / total_valid).item(),
-            'kl_div': kl_div.item()
+            'actor_loss': actor_loss,
+            'bc_loss': bc_loss,
+            'policy_loss': policy_loss,
+            'critic_loss': critic_loss,
+            'entropy_loss': entropy_loss,
+            'kl_div': kl_div,
         }
 
     def _reshape_data(
@@ -320,9 +509,7 @@ class ACERPolicy(Policy):
             self._unroll_len + 1, -1, self._action_shape
         )  # shape (T+1),B,env_action_shape
         rewards = data['reward']  # shape T,B
-        weights_ = 1 - data['done']  # shape T,B
-        weights = torch.ones_like(rewards)  # shape T,B
-        weights = weights_
+        weights = 1 - data['done']  # shape T,B
         return target_logit, behaviour_logit, avg_action_logit, actions, values, rewards, weights
 
     def _state_dict_learn(self) -> Dict[str, Any]:
@@ -362,8 +549,19 @@ class ACERPolicy(Policy):
             Use multinomial_sample to choose action.
         """
         self._collect_unroll_len = self._cfg.collect.unroll_len
+        self._half_precision_storage = self._cfg.half_precision_storage
         self._collect_model = model_wrap(self._model, wrapper_name='multinomial_sample')
         self._collect_model.reset()
+        self._collect_obs_buffer = _ObsBatchBuffer(pin_memory=self._cuda)
+        self._forward_collect_impl = self._forward_batched_gpu if self._cuda else self._forward_batched_cpu
+        # learn mode switches the shared model back to eval mode after each update
+        self._collect_model.eval()
+        if self._cfg.collect.use_torch_compile and hasattr(torch, 'compile'):
+            self._collect_model.forward = _compile_forward(self._collect_model.forward)
+        elif self._cfg.collect.use_jit_trace:
+            traced_forward = self._jit_trace_forward('multinomial_sample')
+            if traced_forward is not None:
+                self._collect_model.forward = traced_forward
 
     def _forward_collect(self, data: Dict[int, Any]) -> Dict[int, Dict[str, Any]]:
         r"""
@@ -379,18 +577,30 @@ class ACERPolicy(Policy):
             - necessary: ``logit``, ``action``
         """
         data_id = list(data.keys())
-        data = default_collate(list(data.values()))
-        if self._cuda:
-            data = to_device(data, self._device)
-        self._collect_model.eval()
-        with torch.no_grad():
-            output = self._collect_model.forward(data, mode='compute_actor')
-        if self._cuda:
-            output = to_device(output, 'cpu')
+        data = self._collect_obs_buffer.collate(list(data.values()))
+        output = self._forward_collect_batched(data)
         output = default_decollate(output)
-        output = {i: d for i, d in zip(data_id, output)}
+        output = dict(zip(data_id, output))
         return output
 
+    def _forward_collect_batched(self, obs: torch.Tensor) -> Dict[str, torch.Tensor]:
+        r"""
+        Overview:
+            Forward computation graph of collect mode on an already batched observation, e.g. the output of a \
+            vectorized env, which runs a single model forward for all the envs and skips the per-env collate.
+        Arguments:
+            - obs (:obj:`torch.Tensor`): Stacked observation of all the envs.
+        Returns:
+            - output (:obj:`Dict[str, torch.Tensor]`): Batched policy_output(logit, action) on cpu.
+        ReturnsKeys
+            - necessary: ``logit``, ``action``
+        Shapes:
+            - obs (:obj:`torch.Tensor`): :math:`(N, obs_shape)`, where N is env num
+            - logit (:obj:`torch.FloatTensor`): :math:`(N, A)`, where A is action dim
+            - action (:obj:`torch.LongTensor`): :math:`(N, )`
+        """
+        return self._forward_collect_impl(self._collect_model, obs)
+
     def _get_train_sample(self, data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         r"""
         Overview:
@@ -400,13 +610,23 @@ class ACERPolicy(Policy):
             - data (:obj:`List[Dict[str, Any]`): The trajectory data(a list of transition), each element is the same \
                 format as the return value of ``self._process_transition`` method.
         Returns:
-            - samples (:obj:`dict`): List of training samples.
+            - samples (:obj:`dict`): List of training samples, the step fields ('obs', 'logit', 'action', \
+                'reward', 'done') of each sample are stacked into tensors of shape :math:`(T, ...)`, and 'next_obs' \
+                only keeps the next observation of the last step.
         .. note::
             We will vectorize ``process_transition`` and ``get_train_sample`` method in the following release version. \
             And the user can customize the this data processing procedure by overriding this two methods and collector \
             itself.
         """
-        return get_train_sample(data, self._unroll_len)
+        samples = get_train_sample(data, self._unroll_len)
+        # Store each sample as a few (T, ...) tensors instead of T separate tensors per field, which reduces the
+        # number of objects held by replay buffer and lets ``default_collate`` stack each field in one call.
+        # next_obs[i] is the same object as obs[i + 1], so only the last one is kept rather than stacking a copy.
+        for sample in samples:
+            for k in ['obs', 'logit', 'action', 'reward', 'done']:
+                sample[k] = torch.stack([torch.as_tensor(v) for v in sample[k]], dim=0)
+            sample['next_obs'] = torch.as_tensor(sample['next_obs'][-1])
+        return samples
 
     def _process_transition(self, obs: Any, policy_output: Dict[str, Any], timestep: namedtuple) -> Dict[str, Any]:
         r"""
@@ -429,6 +649,10 @@ class ACERPolicy(Policy):
             'reward': timestep.reward,
             'done': timestep.done,
         }
+        if self._half_precision_storage:
+            for k in ['obs', 'next_obs', 'logit']:
+                if isinstance(transition[k], torch.Tensor) and transition[k].is_floating_point():
+                    transition[k] = transition[k].half()
         return transition
 
     def _init_eval(self) -> None:
@@ -439,6 +663,16 @@ class ACERPolicy(Policy):
         """
         self._eval_model = model_wrap(self._model, wrapper_name='argmax_sample')
         self._eval_model.reset()
+        self._eval_obs_buffer = _ObsBatchBuffer(pin_memory=self._cuda)
+        self._forward_eval_impl = self._forward_batched_gpu if self._cuda else self._forward_batched_cpu
+        # learn mode switches the shared model back to eval mode after each update
+        self._eval_model.eval()
+        if self._cfg.eval.use_torch_compile and hasattr(torch, 'compile'):
+            self._eval_model.forward = _compile_forward(self._eval_model.forward)
+        elif self._cfg.eval.use_jit_trace:
+            traced_forward = self._jit_trace_forward('argmax_sample')
+            if traced_forward is not None:
+                self._eval_model.forward = traced_forward
 
     def _forward_eval(self, data: Dict[int, Any]) -> Dict[int, Any]:
         r"""
@@ -456,29 +690,90 @@ class ACERPolicy(Policy):
 
         """
         data_id = list(data.keys())
-        data = default_collate(list(data.values()))
-        if self._cuda:
-            data = to_device(data, self._device)
-        self._eval_model.eval()
-        with torch.no_grad():
-            output = self._eval_model.forward(data, mode='compute_actor')
-        if self._cuda:
-            output = to_device(output, 'cpu')
+        data = self._eval_obs_buffer.collate(list(data.values()))
+        output = self._forward_eval_batched(data)
         output = default_decollate(output)
-        output = {i: d for i, d in zip(data_id, output)}
+        output = dict(zip(data_id, output))
+        return output
+
+    def _forward_eval_batched(self, obs: torch.Tensor) -> Dict[str, torch.Tensor]:
+        r"""
+        Overview:
+            Forward computation graph of eval mode on an already batched observation, similar to \
+            ``self._forward_collect_batched``.
+        Arguments:
+            - obs (:obj:`torch.Tensor`): Stacked observation of all the envs.
+        Returns:
+            - output (:obj:`Dict[str, torch.Tensor]`): Batched policy_output(logit, action) on cpu.
+        ReturnsKeys
+            - necessary: ``action``
+            - optional: ``logit``
+        """
+        return self._forward_eval_impl(self._eval_model, obs)
+
+    def _forward_batched_cpu(self, model: Any, obs: torch.Tensor) -> Dict[str, torch.Tensor]:
+        r"""
+        Overview:
+            Run the actor forward of the wrapped ``model`` on a batched cpu observation, without any device transfer.
+        Arguments:
+            - model (:obj:`Any`): The wrapped collect or eval model.
+            - obs (:obj:`torch.Tensor`): Stacked observation of all the envs.
+        Returns:
+            - output (:obj:`Dict[str, torch.Tensor]`): Batched policy_output(logit, action).
+        """
+        with _inference_mode():
+            return model.forward(obs, mode='compute_actor')
+
+    def _forward_batched_gpu(self, model: Any, obs: torch.Tensor) -> Dict[str, torch.Tensor]:
+        r"""
+        Overview:
+            Run the actor forward of the wrapped ``model`` on cuda, copying the batched observation to device and \
+            the output back to cpu asynchronously, with only one synchronization at the end.
+        Arguments:
+            - model (:obj:`Any`): The wrapped collect or eval model.
+            - obs (:obj:`torch.Tensor`): Stacked observation of all the envs.
+        Returns:
+            - output (:obj:`Dict[str, torch.Tensor]`): Batched policy_output(logit, action) on cpu.
+        """
+        obs = to_device(obs, self._device, non_blocking=True)
+        with _inference_mode():
+            output = model.forward(obs, mode='compute_actor')
+        output = {k: v.to('cpu', non_blocking=True) for k, v in output.items()}
+        torch.cuda.current_stream().synchronize()
         return output
 
+    def _jit_trace_forward(self, wrapper_name: str) -> Optional[Callable]:
+        r"""
+        Overview:
+            Trace ``compute_actor`` of the model with TorchScript, and wrap the traced actor with ``wrapper_name``.
+            The traced module shares parameters with ``self._model``, so it always uses the latest learned weights.
+        Arguments:
+            - wrapper_name (:obj:`str`): The name of the sample wrapper, such as ``multinomial_sample``.
+        Returns:
+            - forward (:obj:`Optional[Callable]`): The forward function of the wrapped traced actor, or None if the \
+                actor can't be traced, in which case the eager model should be used.
+        """
+        obs_shape = self._cfg.model.get('obs_shape', None)
+        if obs_shape is None:
+            return None
+        obs_shape = [obs_shape] if isinstance(obs_shape, int) else list(obs_shape)
+        try:
+            # batch size 2 avoids baking any batch dim squeeze into the traced graph
+            example = torch.zeros(2, *obs_shape, device=self._device)
+            traced_model = torch.jit.trace_module(self._model, {'compute_actor': example}, strict=False)
+        except Exception as e:
+            logging.warning("Fail to trace ACER actor with TorchScript, use eager model instead: {}".format(e))
+            return None
+        return model_wrap(_TracedActor(traced_model), wrapper_name=wrapper_name).forward
+
     def default_model(self) -> Tuple[str, List[str]]:
         return 'acer', ['ding.model.template.acer']
 
     def _monitor_vars_learn(self) -> List[str]:
         r"""
         Overview:
-            Return this algorithm default model setting for demonstration.
+            Return variables' names if variables are to used in monitor.
         Returns:
-            - model_info (:obj:`Tuple[str, List[str]]`): model name and mode import_names
-        .. note::
-            The user can define and use customized network model but must obey the same interface definition indicated \
-            by import_names path. For IMPALA, ``ding.model.interface.IMPALA``
+            - vars (:obj:`List[str]`): Variables' name list.
         """
         return ['actor_loss', 'bc_loss', 'policy_loss', 'critic_loss', 'entropy_loss', 'kl_div']
@@ -0,0 +1,195 @@
+import math
+import pytest
+import torch
+from copy import deepcopy
+
+from ding.envs import BaseEnvTimestep
+from ding.policy import ACERPolicy
+from ding.policy import acer as acer_module
+from ding.rl_utils import acer_trust_region_update
+from ding.utils import deep_merge_dicts
+from dizoo.classic_control.cartpole.config.cartpole_acer_config import cartpole_acer_config
+
+T, B = 4, 3
+OBS_SHAPE, ACTION_SHAPE = 4, 2
+
+
+def get_policy(cfg: dict = None) -> ACERPolicy:
+    policy_cfg = deep_merge_dicts(ACERPolicy.default_config(), deepcopy(cartpole_acer_config.policy))
+    policy_cfg.unroll_len = policy_cfg.learn.unroll_len = policy_cfg.collect.unroll_len = T
+    policy_cfg.learn.batch_size = B
+    if cfg is not None:
+        policy_cfg = deep_merge_dicts(policy_cfg, cfg)
+    return ACERPolicy(policy_cfg)
+
+
+def get_samples(policy: ACERPolicy, traj_num: int = B) -> list:
+    samples = []
+    for _ in range(traj_num):
+        obs = [torch.randn(OBS_SHAPE) for _ in range(T + 1)]
+        transitions = []
+        for t in range(T):
+            policy_output = {'logit': torch.randn(ACTION_SHAPE), 'action': torch.randint(0, ACTION_SHAPE, size=())}
+            timestep = BaseEnvTimestep(obs[t + 1], torch.rand(1), False, {})
+            transitions.append(policy._process_transition(obs[t], policy_output, timestep))
+        samples += policy._get_train_sample(transitions)
+    return samples
+
+
+@pytest.mark.unittest
+def test_acer_entropy_trust_region_gradient(monkeypatch):
+    policy = get_policy({'learn': {'entropy_weight': 1.0, 'trust_region': True}})
+    captured = {}
+
+    def zero_policy_error(q_values, q_retraces, v_pred, target_pi, actions, ratio, c_clip_ratio):
+        # keep only the entropy term in the actor loss
+        return torch.zeros_like(v_pred), torch.zeros_like(v_pred)
+
+    def capture_trust_region_update(actor_gradients, target_pi, avg_pi, trust_region_value):
+        captured['target_pi'] = target_pi.detach().clone()
+        captured['avg_pi'] = avg_pi.detach().clone()
+        captured['gradient'] = acer_trust_region_update(actor_gradients, target_pi, avg_pi, trust_region_value)[0]
+        return [captured['gradient']]
+
+    monkeypatch.setattr(acer_module, 'acer_policy_error', zero_policy_error)
+    monkeypatch.setattr(acer_module, 'acer_trust_region_update', capture_trust_region_update)
+    policy._forward_learn(get_samples(policy))
+
+    # the entropy gradient of the original Categorical implementation, projected by the same trust region
+    target_pi = captured['target_pi'].requires_grad_(True)
+    entropy = torch.distributions.categorical.Categorical(probs=target_pi).entropy()
+    gradient = torch.autograd.grad(-entropy.sum() / (T * B), target_pi)
+    gradient = acer_trust_region_update(gradient, target_pi.detach(), captured['avg_pi'], 1.0)[0]
+    assert torch.allclose(captured['gradient'], gradient, atol=1e-6)
+
+
+@pytest.mark.unittest
+def test_acer_build_target_model():
+    policy = get_policy()
+    rng_state = torch.get_rng_state()
+    target_model = policy._build_target_model()
+    assert torch.equal(torch.get_rng_state(), rng_state)
+    target_state_dict = target_model.state_dict()
+    for k, v in policy._model.state_dict().items():
+        assert torch.equal(v, target_state_dict[k])
+
+
+@pytest.mark.unittest
+def test_acer_train_sample_layout():
+    policy = get_policy()
+    samples = get_samples(policy)
+    assert len(samples) == B
+    for sample in samples:
+        assert sample['obs'].shape == (T, OBS_SHAPE)
+        assert sample['next_obs'].shape == (OBS_SHAPE, )
+        assert sample['logit'].shape == (T, ACTION_SHAPE)
+        assert sample['action'].shape == (T, )
+        assert sample['reward'].shape == (T, 1)
+        assert sample['done'].shape == (T, )
+    data = policy._data_preprocess_learn(deepcopy(samples))
+    assert data['obs_plus_1'].shape == ((T + 1) * B, OBS_SHAPE)
+    assert data['logit'].shape == (T, B, ACTION_SHAPE)
+    assert data['action'].shape == (T, B)
+    assert data['reward'].shape == (T, B)
+    assert data['done'].shape == (T, B)
+    obs_plus_1 = data['obs_plus_1'].view(T + 1, B, OBS_SHAPE)
+    for i, sample in enumerate(samples):
+        assert torch.equal(obs_plus_1[:T, i], sample['obs'])
+        assert torch.equal(obs_plus_1[T, i], sample['next_obs'])
+        assert torch.equal(data['logit'][:, i], sample['logit'])
+        assert torch.equal(data['action'][:, i], sample['action'])
+
+
+def assert_finite_learn_info(policy: ACERPolicy, info: dict) -> None:
+    for k in policy._monitor_vars_learn():
+        assert math.isfinite(info[k]), k
+
+
+@pytest.mark.unittest
+def test_acer_jit_trace():
+    policy = get_policy({'collect': {'use_jit_trace': True}, 'eval': {'use_jit_trace': True}})
+    for model in [policy._collect_model, policy._eval_model]:
+        # forward is replaced by the one of sample wrapper -> base wrapper -> traced actor
+        assert isinstance(model.forward.__self__._model._model, acer_module._TracedActor)
+    obs = {i: torch.randn(OBS_SHAPE) for i in range(B)}
+    batch_obs = torch.stack(list(obs.values()))
+    with torch.no_grad():
+        old_logit = policy._model.compute_actor(batch_obs)['logit']
+    assert_finite_learn_info(policy, policy._forward_learn(get_samples(policy)))
+    with torch.no_grad():
+        new_logit = policy._model.compute_actor(batch_obs)['logit']
+    assert not torch.allclose(old_logit, new_logit)
+    # the traced actor shares parameters with the learn model, so it uses the updated weights
+    for forward in [policy._forward_collect, policy._forward_eval]:
+        output = forward(obs)
+        logit = torch.stack([output[i]['logit'] for i in range(B)])
+        assert torch.allclose(logit, new_logit, atol=1e-6)
+
+
+@pytest.mark.unittest
+@pytest.mark.skipif(not hasattr(torch, 'compile'), reason='torch.compile is only available since torch 2.0')
+def test_acer_torch_compile():
+    policy = get_policy(
+        {
+            'learn': {
+                'use_torch_compile': True
+            },
+            'collect': {
+                'use_torch_compile': True
+            },
+            'eval': {
+                'use_torch_compile': True
+            },
+        }
+    )
+    assert_finite_learn_info(policy, policy._forward_learn(get_samples(policy)))
+    obs = {i: torch.randn(OBS_SHAPE) for i in range(B)}
+    for forward in [policy._forward_collect, policy._forward_eval]:
+        output = forward(obs)
+        assert set(output.keys()) == set(obs.keys())
+        for o in output.values():
+            assert o['logit'].shape == (ACTION_SHAPE, )
+            assert o['action'].shape == ()
+
+
+@pytest.mark.unittest
+def test_acer_half_precision_storage():
+    policy = get_policy({'half_precision_storage': True})
+    samples = get_samples(policy)
+    for k in ['obs', 'next_obs', 'logit']:
+        assert samples[0][k].dtype == torch.float16
+    data = policy._data_preprocess_learn(deepcopy(samples))
+    assert data['obs_plus_1'].dtype == torch.float32
+    assert data['logit'].dtype == torch.float32
+    assert_finite_learn_info(policy, policy._forward_learn(samples))
+
+
+@pytest.mark.cudatest
+@pytest.mark.skipif(
+    not hasattr(torch.cuda, 'set_sync_debug_mode'), reason='set_sync_debug_mode is only available since torch 1.10'
+)
+def test_acer_learn_single_sync(monkeypatch):
+    policy = get_policy({'cuda': True})
+    # warm up the lazy cuda initialization outside the checked step
+    policy._forward_learn(get_samples(policy))
+    samples = get_samples(policy)
+    tolist = torch.Tensor.tolist
+    sync_tensors = []
+
+    def relaxed_tolist(self):
+        # fetching the logged scalars is the only device-host sync allowed in a learn step
+        sync_tensors.append(self)
+        torch.cuda.set_sync_debug_mode(0)
+        try:
+            return tolist(self)
+        finally:
+            torch.cuda.set_sync_debug_mode('error')
+
+    monkeypatch.setattr(torch.Tensor, 'tolist', relaxed_tolist)
+    torch.cuda.set_sync_debug_mode('error')
+    try:
+        info = policy._forward_learn(samples)
+    finally:
+        torch.cuda.set_sync_debug_mode(0)
+    assert len(sync_tensors) == 1 and sync_tensors[0].is_cuda
+    assert_finite_learn_info(policy, info)
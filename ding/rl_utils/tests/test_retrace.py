@@ -0,0 +1,33 @@
+import pytest
+import torch
+from ding.rl_utils import compute_q_retraces
+
+
+def naive_q_retraces(q_values, v_pred, rewards, actions, weights, ratio, gamma=0.9):
+    q_retraces = torch.zeros_like(v_pred)
+    tmp_retraces = v_pred[-1]
+    q_retraces[-1] = v_pred[-1]
+    for idx in reversed(range(rewards.shape[0])):
+        action = actions[idx].unsqueeze(-1)
+        q_retraces[idx] = rewards[idx].unsqueeze(-1) + gamma * weights[idx].unsqueeze(-1) * tmp_retraces
+        c = ratio[idx].gather(-1, action).clamp(max=1.0)
+        tmp_retraces = c * (q_retraces[idx] - q_values[idx].gather(-1, action)) + v_pred[idx]
+    return q_retraces
+
+
+@pytest.mark.unittest
+def test_compute_q_retraces():
+    T, B, N = 8, 4, 3
+    q_values = torch.randn(T + 1, B, N)
+    v_pred = torch.randn(T + 1, B, 1)
+    rewards = torch.randn(T, B)
+    actions = torch.randint(0, N, size=(T, B))
+    # done in the middle of the sequence
+    weights = torch.ones(T, B)
+    weights[T // 2, :B // 2] = 0.
+    weights[1, -1] = 0.
+    ratio = torch.rand(T, B, N) * 2
+    q_retraces = compute_q_retraces(q_values, v_pred, rewards, actions, weights, ratio, gamma=0.95)
+    assert q_retraces.shape == (T + 1, B, 1)
+    expected = naive_q_retraces(q_values, v_pred, rewards, actions, weights, ratio, gamma=0.95)
+    assert torch.allclose(q_retraces, expected, atol=1e-6)
@@ -9,7 +9,7 @@ import numpy as np
 import torch
 
 
-def to_device(item: Any, device: str, ignore_keys: list = []) -> Any:
+def to_device(item: Any, device: str, ignore_keys: list = [], non_blocking: bool = False) -> Any:
     r"""
     Overview:
         Transfer data to certain device
@@ -17,6 +17,8 @@ def to_device(item: Any, device: str, ignore_keys: list = []) -> Any:
         - item (:obj:`Any`): the item to be transferred
         - device (:obj:`str`): the device wanted
         - ignore_keys (:obj:`list`): the keys to be ignored in transfer, defalut set to empty
+        - non_blocking (:obj:`bool`): whether to copy cpu tensors to cuda asynchronously, these tensors are \
+            staged in pinned memory first. Other transfers are always synchronous, defalut set to False
     Returns:
         - item (:obj:`Any`): the transferred item
     .. note:
@@ -28,19 +30,21 @@ def to_device(item: Any, device: str, ignore_keys: list = []) -> Any:
     if isinstance(item, torch.nn.Module):
         return item.to(device)
     elif isinstance(item, torch.Tensor):
+        if non_blocking and item.device.type == 'cpu' and torch.device(device).type == 'cuda':
+            return item.pin_memory().to(device, non_blocking=True)
         return item.to(device)
     elif isinstance(item, Sequence):
         if isinstance(item, str):
             return item
         else:
-            return [to_device(t, device) for t in item]
+            return [to_device(t, device, non_blocking=non_blocking) for t in item]
     elif isinstance(item, dict):
         new_item = {}
         for k in item.keys():
             if k in ignore_keys:
                 new_item[k] = item[k]
             else:
-                new_item[k] = to_device(item[k], device)
+                new_item[k] = to_device(item[k], device, non_blocking=non_blocking)
         return new_item
     elif isinstance(item, numbers.Integral) or isinstance(item, numbers.Real):
         return item
@@ -206,6 +206,10 @@ def test_to_device_cuda(setup_data_dict):
     other = EasyTimer()
     with pytest.raises(TypeError):
         to_device(other)
+    async_d = to_device(setup_data_dict, device, ignore_keys=['module'], non_blocking=True)
+    torch.cuda.synchronize()
+    assert async_d['tensor'].device.type == 'cuda'
+    assert torch.equal(async_d['tensor'].cpu(), setup_data_dict['tensor'])
 
 
 @pytest.mark.unittest
@@ -217,3 +221,5 @@ def test_to_device_cpu(setup_data_dict):
     other = EasyTimer()
     with pytest.raises(TypeError):
         to_device(other)
+    cpu_d = to_device(setup_data_dict, device, non_blocking=True)
+    assert torch.equal(cpu_d['tensor'], setup_data_dict['tensor'])